@@ -10,6 +10,18 @@ AutoPATT(source_path, legacy=False)
 # Use example: 
 data = import_files(directory_of_outputs, legacy=False)
 
+# Use example: zip/tar archive of outputs, parsed without extraction
+data = import_files('outputs.zip')
+for ID, session in iter_archive('outputs.tar.gz'):
+    ...
+
+# Use example: parse identical outputs only once and report duplicates
+data = import_files(directory_of_outputs, dedup=True)
+duplicate_groups(data)
+
+# Use example: in-memory output
+AutoPATT(output_bytes, name='S101')
+
 # Use example: csv_repair and older AutoPATT versions
 # For use with edited or manually generated output to match format of AutoPATT
 # generated output
@@ -21,13 +33,80 @@ Created on Thu Jul  2 14:43:03 2020
 
 """
 
+import copy
+import hashlib
 import io
 import os
-from ntpath import basename
+import tarfile
+import zipfile
 
 import pandas as pd
+from clusters import ClusterArray
 from contextmanager import change_dir, enter_dir
 from csv_repair import dir_csv_repair
+from sinks import open_sink
+
+
+# AutoPATT analyses compared by compare_all
+ANALYSIS_LIST = ['phonetic_inv', 'phonemic_inv', 'cluster_inv', 
+                 'out_phones', 'out_phonemes', 'out_clusters', 'targets']
+
+
+def _read_text(source):
+    """Returns AutoPATT output text from bytes or a text/binary file object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+    else:
+        data = source.read()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return data
+
+
+def content_hash(text):
+    """Returns a hex digest identifying the content of an AutoPATT output.
+    
+    Line endings are normalized so that identical outputs hash identically
+    whether read from disk or from an archive."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def clean_rows(lines):
+    """Returns AutoPATT output lines as a list of non-empty strings with 
+    quotes and surrounding whitespace and commas removed."""
+    output = [i.strip().strip(',\n') for i in lines]
+    output = [i.replace('"', '') for i in output]
+    return [i for i in output if i]
+
+
+def parse_session_info(output):
+    """
+    Parses the session/metadata block at the top of AutoPATT output >= v0.7.
+    
+    Parameters:
+        output : list of rows from clean_rows(). Only rows up to and 
+                 including the analysis date row are needed.
+    
+    Returns dictionary of version, lang, session, corpus, total_records, 
+    records, analysis_date and analysis_time. See AutoPATT.
+    Raises ValueError if the 'Analysis date:' anchor row is missing.
+    """
+    i_sesrow_end = output.index('Analysis date:')-2
+    i_date = output.index('Analysis date:')+1
+    i_ver = output.index('Analysis date:')-2
+    i_lang = output.index('Analysis date:')-1
+    # Separate rows with session information
+    sesrows = output[:i_sesrow_end]
+    sesrows = sesrows[1::2]
+    return {'version': float(output[i_ver].split(' ')[2]),
+            'lang': output[i_lang][output[i_lang].rfind(':')+2:],
+            'session': [x.split(',')[0] for x in sesrows],
+            'corpus': [x.split(',')[1] for x in sesrows],
+            'total_records': sum([int(x.split(',')[2]) for x in sesrows]),
+            'records': [int(x.split(',')[2]) for x in sesrows],
+            'analysis_date': output[i_date].split(' ')[0],
+            'analysis_time': output[i_date].split(' ')[1]}
 
 
 # Class AutoPATT Session
@@ -35,27 +114,38 @@ class AutoPATT(object):
     """
     Represents an AutoPATT csv output file in Python
     """
-    def __init__(self, source_path, legacy=False, robust=False):
+    def __init__(self, source_path, legacy=False, robust=False, name=None):
         """Instantiates an AutoPATT object with relevant data from the output.
         
         Parameters:
-            source_path : str, path to source AutoPATT output file
+            source_path : str, path to source AutoPATT output file. May also
+                          be AutoPATT output as bytes, or a text or binary 
+                          file-like object (e.g. io.StringIO or an archive 
+                          member opened with zipfile/tarfile).
             legacy : bool, set to True for compatibility with AutoPATT output
                  < v0.7. Set to to False for compatibility with >= v0.7. 
                  Default = False
             robust : bool, set to True to coerce some nonstandard IPA elements 
                      to standard IPA. This parameter is not fully tested. 
                      Default = False
+            name : str, name of the output. Default is derived from the 
+                   source file name, or '<memory>' if the source has no name.
         
         Note: Output data are stored as attributes within the object. To access 
               attributes, use AUTOPATT-OBJECT.ATTR-NAME. For example: 
               myAutoPATTsession.out_phones
         
         Attributes:
-            source: (str) absolute path to source AutoPATT output file
+            source: (str) absolute path to source AutoPATT output file, or 
+                name of the in-memory source (None if unnamed)
             name: (str) source output file name
-            file_location: (str) absolute path to source file directory
+            file_location: (str) absolute path to source file directory (None
+                for in-memory sources)
             output: string containing contents of AutoPATT output file
+            content_hash: (str) digest of the output contents. Identical
+                outputs have identical hashes (see content_hash)
+            legacy: (bool) legacy setting the output was parsed with
+            robust: (bool) robust setting the output was parsed with
             version: (str) AutoPATT version number
             lang: (str) language of AutoPATT analysis
             session: list of session in AutoPATT analysis
@@ -75,103 +165,103 @@ class AutoPATT(object):
             out_clusters: list of clusters (str) missing from cluster inventory
         """               
         # Attributes stored in the AutoPATT object
-        self.source = os.path.abspath(source_path)
-        self.name = basename(source_path)[:basename(source_path).rfind(".")]
-        self.file_location = '\\'.join(os.path.abspath(
-            source_path).split('\\')[:-1])                       
-        with io.open(self.source, mode='r', encoding='utf-8') as infile:            
-            # Read source AutoPATT output file as a list of strings
-            output = infile.readlines()
-            output = [i.strip().strip(',\n') for i in output]
-            output = [i.replace('"', '') for i in output]
-            output = [i for i in output if i]           
-            # Use anchor rows to get row indices
-            if legacy:
-                pass
-            else:
-                i_sesrow_end = output.index('Analysis date:')-2
-                i_date = output.index('Analysis date:')+1
-                i_ver = output.index('Analysis date:')-2
-                i_lang = output.index('Analysis date:')-1
-            if self.name == '1049':
-                print('got it)')
-                print('got it')
-                pass
-            i_pt_inv_start = output.index('PHONETIC INVENTORY:')+2
-            i_mp_start = output.index('Minimal Pairs:')+1
-            i_pm_inv_start = output.index('PHONEMIC INVENTORY:')+2
-            i_cl_inv = output.index('CLUSTER INVENTORY:')+1
-            try:
-                i_targ = [
-                    x.startswith('TARGETS') for x in output].index(True)+1
-            except ValueError:
-                # No targets found
-                i_targ = None
-            i_pt_out = output.index('Phones to monitor:')+1
-            i_pm_out = output.index('Phonemes to monitor:')+1
-            i_cl_out = output.index('Clusters to monitor:')+1           
-            # Derive attributes from AutoPATT output string            
-            self.output = output            
-            if legacy:
-                pass
+        if isinstance(source_path, (str, os.PathLike)):
+            self.source = os.path.abspath(source_path)
+            self.file_location = os.path.dirname(self.source)
+            with io.open(self.source, mode='r', encoding='utf-8') as infile:
+                text = infile.read()
+        else:
+            self.source = getattr(source_path, 'name', None)
+            self.file_location = None
+            text = _read_text(source_path)
+        if name is None:
+            if self.source:
+                name = os.path.basename(self.source)
+                name = name[:name.rfind('.')] if '.' in name else name
             else:
-                self.version = float(output[i_ver].split(' ')[2])
-                self.lang = output[i_lang][output[i_lang].rfind(':')+2:]
-                # Separate rows with session information
-                sesrows = output[:i_sesrow_end]
-                sesrows = sesrows[1::2]
-                self.session = [x.split(',')[0] for x in sesrows]
-                self.corpus = [x.split(',')[1] for x in sesrows]
-                self.total_records = sum([int(x.split(',')[2]) for x in sesrows])            
-                self.records = [int(x.split(',')[2]) for x in sesrows]
-                self.analysis_date = output[i_date].split(' ')[0]
-                self.analysis_time = output[i_date].split(' ')[1]
-            # Get phonetic inventory
-            phonetic_inv_rows = output[i_pt_inv_start:i_mp_start-1]
-            self.phonetic_inv = [x.split(',')[1:] for x in phonetic_inv_rows]
-            self.phonetic_inv = [j for i in self.phonetic_inv for j in i]
-            self.phonetic_inv = [x for x in self.phonetic_inv if x.strip() != '']
-            # Get minimal pairs
-            self.minimal_pairs = output[i_mp_start:i_pm_inv_start-2]
-            self.minimal_pairs = [x.split(',') for x in self.minimal_pairs]
-            # Get phonemic inventory
-            phonemic_inv_rows = output[i_pm_inv_start:i_cl_inv-1]
-            self.phonemic_inv = [x.split(',')[1:] for x in phonemic_inv_rows]
-            self.phonemic_inv = [j for i in self.phonemic_inv for j in i]
-            self.phonemic_inv = [x for x in self.phonemic_inv if x.strip() != '']
-            # Get cluster inventory
-            self.cluster_inv = output[i_cl_inv].split(',')
-            # Get targets
-            try:
-                self.targets = output[i_targ].split(',')
-            except TypeError:
-                # No targets found
-                self.targets = None
-            # Get out phones to monitor
-            self.out_phones = output[i_pt_out].split(',')
-            # Get out phonemes to monitor
-            self.out_phonemes = output[i_pm_out].split(',')
-            # Get out clusters to monitor
-            self.out_clusters = output[i_cl_out].split(',')            
-            # Robust setting coerces nonstandard IPA elements to standard IPA
-            if robust:
-                att_list = [self.phonetic_inv, self.minimal_pairs, 
-                            self.phonemic_inv, self.cluster_inv, self.targets,
-                            self.out_phones, self.out_phonemes, self.out_clusters]
-                for i, att in enumerate(att_list):
-                    for num, x in enumerate(att_list[i]):
-                        try:                                              
-                            att_list[i][num] = att_list[i][num].replace('g', 'ɡ')
-                # Replacements for minimal pairs
-                        except AttributeError: 
-                            for ix, word in enumerate(att_list[i][num]):
-                                att_list[i][num][ix] = att_list[i][num][ix].replace('g', 'ɡ')
-                            
+                name = '<memory>'
+        self.name = name
+        self.content_hash = content_hash(text)
+        self.legacy = legacy
+        self.robust = robust
+        # Read source AutoPATT output as a list of strings
+        output = clean_rows(text.splitlines())
+        # Use anchor rows to get row indices
+        i_pt_inv_start = output.index('PHONETIC INVENTORY:')+2
+        i_mp_start = output.index('Minimal Pairs:')+1
+        i_pm_inv_start = output.index('PHONEMIC INVENTORY:')+2
+        i_cl_inv = output.index('CLUSTER INVENTORY:')+1
+        try:
+            i_targ = [
+                x.startswith('TARGETS') for x in output].index(True)+1
+        except ValueError:
+            # No targets found
+            i_targ = None
+        i_pt_out = output.index('Phones to monitor:')+1
+        i_pm_out = output.index('Phonemes to monitor:')+1
+        i_cl_out = output.index('Clusters to monitor:')+1           
+        # Derive attributes from AutoPATT output string            
+        self.output = output            
+        if legacy:
+            pass
+        else:
+            for attr, value in parse_session_info(output).items():
+                setattr(self, attr, value)
+        # Get phonetic inventory
+        phonetic_inv_rows = output[i_pt_inv_start:i_mp_start-1]
+        self.phonetic_inv = [x.split(',')[1:] for x in phonetic_inv_rows]
+        self.phonetic_inv = [j for i in self.phonetic_inv for j in i]
+        self.phonetic_inv = [x for x in self.phonetic_inv if x.strip() != '']
+        # Get minimal pairs
+        self.minimal_pairs = output[i_mp_start:i_pm_inv_start-2]
+        self.minimal_pairs = [x.split(',') for x in self.minimal_pairs]
+        # Get phonemic inventory
+        phonemic_inv_rows = output[i_pm_inv_start:i_cl_inv-1]
+        self.phonemic_inv = [x.split(',')[1:] for x in phonemic_inv_rows]
+        self.phonemic_inv = [j for i in self.phonemic_inv for j in i]
+        self.phonemic_inv = [x for x in self.phonemic_inv if x.strip() != '']
+        # Get cluster inventory
+        self.cluster_inv = output[i_cl_inv].split(',')
+        # Get targets
+        try:
+            self.targets = output[i_targ].split(',')
+        except TypeError:
+            # No targets found
+            self.targets = None
+        # Get out phones to monitor
+        self.out_phones = output[i_pt_out].split(',')
+        # Get out phonemes to monitor
+        self.out_phonemes = output[i_pm_out].split(',')
+        # Get out clusters to monitor
+        self.out_clusters = output[i_cl_out].split(',')            
+        # Tokenized cluster inventories, built on demand by cluster_array()
+        self._cluster_arrays = {}
+        # Robust setting coerces nonstandard IPA elements to standard IPA
+        if robust:
+            att_list = [self.phonetic_inv, self.minimal_pairs, 
+                        self.phonemic_inv, self.cluster_inv, self.targets,
+                        self.out_phones, self.out_phonemes, self.out_clusters]
+            for i, att in enumerate(att_list):
+                for num, x in enumerate(att_list[i]):
+                    try:                                              
+                        att_list[i][num] = att_list[i][num].replace('g', 'ɡ')
+            # Replacements for minimal pairs
+                    except AttributeError: 
+                        for ix, word in enumerate(att_list[i][num]):
+                            att_list[i][num][ix] = att_list[i][num][ix].replace('g', 'ɡ')
+                        
     
     def __repr__(self):
         return f'AutoPATT object {self.name}'
     
     
+    def same_parse(self, other):
+        """Returns True if other was parsed from identical output with the 
+        same legacy and robust settings, so all parsed data are equal."""
+        return ((self.content_hash, self.legacy, self.robust) == 
+                (other.content_hash, other.legacy, other.robust))
+    
+    
     def var_to_df(self, var, label=None, cells="list"):
         """Converts a variable to a pandas dataframe from an AutoPATT object,
         
@@ -206,6 +296,19 @@ class AutoPATT(object):
         return df
 
 
+    def cluster_array(self, var='cluster_inv'):
+        """Returns a cluster inventory variable as a ClusterArray of 
+        tokenized clusters (see clusters). Built once per object and variable.
+        
+        Args:
+            var: a string representing an AutoPATT cluster variable, 
+                cluster_inv or out_clusters. Default = 'cluster_inv'
+        """
+        if var not in self._cluster_arrays:
+            self._cluster_arrays[var] = ClusterArray(getattr(self, var))
+        return self._cluster_arrays[var]
+
+
     def compare(self, other, var):
         """
         Compares inventories of two AutoPATT objects.
@@ -216,17 +319,15 @@ class AutoPATT(object):
         attr_left = getattr(self, var)
         attr_right = getattr(other, var)
         
-        result_dict = {'overlap':[], 
-                       self.name+' L unique':[], 
-                       other.name+' R unique':[]}
-        for x in attr_left:
-            if x in attr_right:
-                result_dict['overlap'].append(x)
-            else:
-                result_dict[self.name+' L unique'].append(x)
-        for x in attr_right:
-            if x not in attr_left:
-                result_dict[other.name+' R unique'].append(x)                
+        # Identical parsed outputs need no element-wise comparison
+        if self.same_parse(other):
+            overlap, left_unique, right_unique = list(attr_left or []), [], []
+        else:
+            overlap, left_unique, right_unique = _compare_lists(attr_left, 
+                                                                attr_right)
+        result_dict = {'overlap':overlap, 
+                       self.name+' L unique':left_unique, 
+                       other.name+' R unique':right_unique}
         print('Overlap:')
         print(result_dict['overlap'])
         print(f'Unique L {self.name}:')
@@ -236,6 +337,20 @@ class AutoPATT(object):
         return result_dict
     
   
+def _compare_lists(attr_left, attr_right):
+    """Returns (overlap, left unique, right unique) lists for two inventories,
+    preserving the order of elements. None is treated as an empty inventory.
+    """
+    attr_left = attr_left or []
+    attr_right = attr_right or []
+    set_left = set(attr_left)
+    set_right = set(attr_right)
+    overlap = [x for x in attr_left if x in set_right]
+    left_unique = [x for x in attr_left if x not in set_right]
+    right_unique = [x for x in attr_right if x not in set_left]
+    return overlap, left_unique, right_unique
+
+
 def compare_text(inv_left, inv_right):
     """
     Compares two string/text inventories. 
@@ -269,11 +384,9 @@ def compare_all(dict_left, dict_right):
     Returns dictionary of compared results.
     """
     
-    analysis_list = ['phonetic_inv', 'phonemic_inv', 'cluster_inv', 
-                     'out_phones', 'out_phonemes', 'out_clusters', 'targets']
     all_results = {}
     
-    for analysis in analysis_list:        
+    for analysis in ANALYSIS_LIST:        
         comparison_result = {}    
         for key in dict_left.keys():
             result = dict_left[key].compare(dict_right[key], analysis)
@@ -282,12 +395,76 @@ def compare_all(dict_left, dict_right):
     return all_results
 
 
-def import_files(directory, legacy=False, minimal_pairs_repair=False, robust=False):
+def compare_all_chunked(dict_left, dict_right, output_path, chunk_size=500,
+                        analysis_list=ANALYSIS_LIST, output_dir=None):
+    """
+    Compares all AutoPATT analysis results for two dictionaries of AutoPATT
+    objects, writing results to a file as they are produced instead of 
+    holding them in memory. Keys are processed in chunks of chunk_size.
+    
+    Results are written in long format, one row per key, analysis and result
+    with columns:
+        ID : key in dict_left/dict_right
+        analysis : AutoPATT attribute compared, e.g. 'phonetic_inv'
+        result : 'overlap', 'L unique' or 'R unique'
+        elements : comma-separated elements, e.g. 'p,b,t'
+    
+    Parameters:
+        dict_left : dict of AutoPATT objects (L)
+        dict_right : dict of AutoPATT objects (R)
+        output_path : path to output file. Format is chosen by extension,
+                      see sinks.open_sink (.csv, .parquet, .db, .jsonl)
+        chunk_size : int, number of keys compared per chunk. Results are 
+                     flushed to disk after each chunk. Default = 500
+        analysis_list : list of AutoPATT attributes to compare. 
+                        Default = ANALYSIS_LIST
+        output_dir : path to directory for output_path. Default = None
+    
+    Returns dictionary of keys present on only one side, as 
+    {'L only': [keys], 'R only': [keys]}. These keys are not compared.
+    Raises ValueError if chunk_size is less than 1.
+    """
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError(f'chunk_size must be an integer >= 1, not {chunk_size!r}')
+    missing = {'L only': [k for k in dict_left if k not in dict_right],
+               'R only': [k for k in dict_right if k not in dict_left]}
+    if missing['L only'] or missing['R only']:
+        print(f"WARNING: {len(missing['L only'])} keys only in L and "
+              f"{len(missing['R only'])} keys only in R were not compared.")
+    keys = [k for k in dict_left if k in dict_right]
+    
+    columns = ['ID', 'analysis', 'result', 'elements']
+    batch_size = chunk_size * len(analysis_list) * 3
+    with open_sink(output_path, columns, output_dir=output_dir, 
+                   batch_size=batch_size) as sink:
+        for start in range(0, len(keys), chunk_size):
+            for key in keys[start:start+chunk_size]:
+                left = dict_left[key]
+                right = dict_right[key]
+                identical = left.same_parse(right)
+                for analysis in analysis_list:
+                    attr_left = getattr(left, analysis, None)
+                    if identical:
+                        result = (list(attr_left or []), [], [])
+                    else:
+                        result = _compare_lists(
+                            attr_left, getattr(right, analysis, None))
+                    for label, elements in zip(
+                            ('overlap', 'L unique', 'R unique'), result):
+                        sink.write((key, analysis, label, ','.join(elements)))
+            sink.flush()
+    print(f'Comparison results saved to {sink.path}')
+    return missing
+
+
+def import_files(directory, legacy=False, minimal_pairs_repair=False, robust=False,
+                 dedup=False):
     """
     Imports a directory of AutoPATT outputs as a dict of AutoPATT objects.
     
     Parameters:
-        directory : path to directory of AutoPATT outputs
+        directory : path to directory of AutoPATT outputs, or to a zip/tar 
+                    archive of AutoPATT outputs (see import_archive)
         legacy : bool, set to True for compatibility with AutoPATT output
                  < v0.7. Set to to False for compatibility with >= v0.7. 
                  Default = False
@@ -297,11 +474,20 @@ def import_files(directory, legacy=False, minimal_pairs_repair=False, robust=Fal
                                WARNING: THIS MODIFIES THE ORIGINAL FILES.
         robust : bool, set to True to coerce some nonstandard IPA elements 
                  to standard IPA. Default=False
+        dedup : bool, set to True to parse each distinct output only once. 
+                Outputs with identical content (see content_hash) share the
+                parsed data of the first one found. Default=False
     
     Returns dictionary of AutoPATT objects
     """    
     
+    if os.path.isfile(directory):
+        if minimal_pairs_repair:
+            print('WARNING: minimal_pairs_repair is not supported for archives.')
+        return import_archive(directory, legacy=legacy, robust=robust, 
+                              dedup=dedup)
     autopatt_objs = {}
+    parsed = {}
     with change_dir(directory):
         # First repair output if minimual_pairs_repair specified
         if minimal_pairs_repair:
@@ -315,11 +501,141 @@ def import_files(directory, legacy=False, minimal_pairs_repair=False, robust=Fal
         for f in os.listdir(directory):
             if f.endswith('.csv'):
                 ID = f.replace('.csv', '')                           
-                autopatt_objs[ID] = AutoPATT(f, legacy=legacy, robust=robust)
+                if not dedup:
+                    autopatt_objs[ID] = AutoPATT(f, legacy=legacy, robust=robust)
+                    continue
+                with io.open(f, mode='r', encoding='utf-8') as infile:
+                    text = infile.read()
+                autopatt = _parse_cached(text, parsed, ID, legacy, robust)
+                autopatt.source = os.path.abspath(f)
+                autopatt.file_location = os.path.dirname(autopatt.source)
+                autopatt_objs[ID] = autopatt
     print('AutoPATT objects added to dictionary')
+    if dedup:
+        _print_dedup_summary(autopatt_objs)
     return autopatt_objs    
 
 
+def iter_archive(archive_path, legacy=False, robust=False, dedup=False):
+    """
+    Iterates over AutoPATT outputs in a zip or tar archive without 
+    extracting them to disk. Members are read and parsed one at a time.
+    
+    Parameters:
+        archive_path : path to .zip, .tar, .tar.gz, .tgz, etc. archive
+        legacy : bool, see AutoPATT. Default = False
+        robust : bool, see AutoPATT. Default = False
+        dedup : bool, see import_files. Default = False
+    
+    Yields (ID, AutoPATT object) tuples, where ID is the member file name 
+    without directories or the .csv extension. If that ID was already 
+    yielded (same file name in another folder), the member path relative to
+    the archive root is used as ID instead and a warning is printed.
+    """
+    archive_path = os.path.abspath(archive_path)
+    parsed = {}
+    seen = set()
+    for member, infile in _iter_archive_members(archive_path):
+        ID = _unique_id(member, seen)
+        with infile:
+            if dedup:
+                autopatt = _parse_cached(_read_text(infile), parsed, ID, 
+                                         legacy, robust)
+            else:
+                autopatt = AutoPATT(infile, legacy=legacy, robust=robust, 
+                                    name=ID)
+        autopatt.file_location = None
+        autopatt.source = os.path.join(archive_path, member)
+        yield ID, autopatt
+
+
+def import_archive(archive_path, legacy=False, robust=False, dedup=False):
+    """
+    Imports a zip or tar archive of AutoPATT outputs as a dict of AutoPATT 
+    objects. See iter_archive.
+    
+    Returns dictionary of AutoPATT objects
+    """
+    autopatt_objs = dict(iter_archive(archive_path, legacy=legacy, 
+                                      robust=robust, dedup=dedup))
+    print('AutoPATT objects added to dictionary')
+    if dedup:
+        _print_dedup_summary(autopatt_objs)
+    return autopatt_objs
+
+
+def duplicate_groups(autopatt_objs):
+    """
+    Groups AutoPATT objects with identical output content.
+    
+    Parameters:
+        autopatt_objs : dict of AutoPATT objects, e.g. from import_files
+    
+    Returns dictionary of content hash: sorted list of keys, for groups of 
+    two or more identical outputs only.
+    """
+    groups = {}
+    for key, autopatt in autopatt_objs.items():
+        groups.setdefault(autopatt.content_hash, []).append(key)
+    return {h: sorted(keys) for h, keys in groups.items() if len(keys) > 1}
+
+
+def _parse_cached(text, parsed, name, legacy, robust):
+    """Parses AutoPATT output text, reusing a previously parsed object from 
+    the parsed dict (content hash: AutoPATT) if the content is identical. 
+    Duplicates are shallow copies sharing the parsed data."""
+    key = content_hash(text)
+    if key not in parsed:
+        parsed[key] = AutoPATT(io.StringIO(text), legacy=legacy, 
+                               robust=robust, name=name)
+        return parsed[key]
+    duplicate = copy.copy(parsed[key])
+    duplicate.name = name
+    return duplicate
+
+
+def _print_dedup_summary(autopatt_objs):
+    groups = duplicate_groups(autopatt_objs)
+    n_dup = sum(len(keys) - 1 for keys in groups.values())
+    print(f'{n_dup} duplicate outputs found in {len(groups)} groups')
+
+
+def _unique_id(source, seen):
+    """Returns the ID for an output path: its file name without .csv, or, if
+    that ID is already in the set seen, the full path without .csv. The ID 
+    returned is added to seen."""
+    ID = os.path.basename(source).replace('.csv', '')
+    if ID in seen:
+        alt_ID = source[:-len('.csv')] if source.endswith('.csv') else source
+        print(f'WARNING: ID {ID} already used. {source} added as {alt_ID}')
+        ID = alt_ID
+    seen.add(ID)
+    return ID
+
+
+def _iter_archive_members(archive_path):
+    """Yields (member name, open binary file) for .csv members of an archive.
+    
+    macOS resource fork entries (__MACOSX/, ._*) are skipped."""
+    def wanted(member):
+        base = os.path.basename(member)
+        return (member.endswith('.csv') and not base.startswith('._')
+                and not member.startswith('__MACOSX/'))
+    
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    yield info.filename, archive.open(info)
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path, mode='r:*') as archive:
+            for info in archive:
+                if info.isfile() and wanted(info.name):
+                    yield info.name, archive.extractfile(info)
+    else:
+        raise ValueError(f'{archive_path} is not a zip or tar archive')
+
+
 def gen_output(self):
     
     """"
@@ -11,11 +11,22 @@ Created on Thu Oct  1 15:37:51 2020
 import pandas as pd
 import ast
 from AutoPATTPy import import_files, compare_all
+from sinks import open_sink
 
-def validation_proj_data(dir_manual_data, dir_auto_data): 
+def validation_proj_data(dir_manual_data, dir_auto_data, output_dir='.', 
+                         output_format='csv'): 
 
     """
-    Exports comparison data in three formats as csv files to this file's directory.
+    Exports comparison data in three formats (results_data, mismatch_data,
+    wider_data) to output_dir. Rows are streamed to result sinks (see sinks)
+    as they are produced.
+    
+    Parameters:
+        dir_manual_data : path to directory of manual PATT data (L)
+        dir_auto_data : path to directory of AutoPATT data (R)
+        output_dir : path to directory for output files. Default = '.'
+        output_format : str, file extension of output files, one of 'csv', 
+                        'parquet', 'db', 'jsonl'. Default = 'csv'
     """
     
     # Set data directories
@@ -29,75 +40,86 @@ def validation_proj_data(dir_manual_data, dir_auto_data):
     
     all_results = compare_all(data_manual, data_auto)
     
-    # Create full empty DF      
-    results_df = pd.DataFrame(index=[i for i in all_results.keys()], columns=[i for i in all_results['phonetic_inv'].keys()])
-    for type_key in all_results.keys():
-        for ID_key in all_results[type_key].keys():            
-            results_df.at[type_key, ID_key] = all_results[type_key][ID_key]
-            
-    # Create mismatch DF
-    mismatch_df = pd.DataFrame(index=[i for i in all_results.keys()], columns=[i for i in all_results['phonetic_inv'].keys()])
-    for type_key in all_results.keys():
-        for ID_key in all_results[type_key].keys():            
-            # Skip items with no errors
-            if len(all_results[type_key][ID_key][f"{ID_key} L unique"]) == 0:
-                if len(all_results[type_key][ID_key][f"{ID_key} R unique"]) == 0:
-                    continue
-            L_mismatch = all_results[type_key][ID_key][f"{ID_key} L unique"]
-            R_mismatch = all_results[type_key][ID_key][f"{ID_key} R unique"]
-            mismatch_df.at[type_key, ID_key] = [L_mismatch, R_mismatch]
-            
-    # Create wider DF
-    index_names = []
-    for tri in zip([i for i in all_results.keys()], 
-                    [i+'_AUTO_omit' for i in all_results.keys()],
-                    [i+'_AUTO_add' for i in all_results.keys()]):
-        index_names += tri        
-    wider_df = pd.DataFrame(index=index_names, columns=[i for i in all_results['phonetic_inv'].keys()])
-    for type_key in all_results.keys():
-        for append in ['', '_AUTO_omit', '_AUTO_add']:            
-            for ID_key in all_results[type_key].keys():       
-                if append == '':
-                    index = 'overlap'
-                if append == '_AUTO_omit':
-                    index = f'{ID_key} L unique'
-                if append == '_AUTO_add':
-                    index = f'{ID_key} R unique'
-                wider_df.at[type_key+append, ID_key] = all_results[type_key][ID_key][index]
-    # Export to CSV
-    results_df.to_csv('results_data.csv',encoding='utf-8')
-    mismatch_df.to_csv('mismatch_data.csv',encoding='utf-8')
-    wider_df.to_csv('wider_data.csv',encoding='utf-8')
+    ID_keys = [i for i in all_results['phonetic_inv'].keys()]
+    columns = [''] + ID_keys
+    results_sink = open_sink(f'results_data.{output_format}', columns, 
+                             output_dir=output_dir)
+    mismatch_sink = open_sink(f'mismatch_data.{output_format}', columns, 
+                              output_dir=output_dir)
+    wider_sink = open_sink(f'wider_data.{output_format}', columns, 
+                           output_dir=output_dir)
+    with results_sink, mismatch_sink, wider_sink:
+        for type_key in all_results.keys():
+            type_results = all_results[type_key]
+            # Full results row
+            results_sink.write([type_key] + [type_results.get(ID_key) 
+                                             for ID_key in ID_keys])
+            # Mismatch row, skipping items with no errors
+            mismatch_row = [type_key]
+            for ID_key in ID_keys:
+                L_mismatch = type_results[ID_key][f"{ID_key} L unique"]
+                R_mismatch = type_results[ID_key][f"{ID_key} R unique"]
+                if len(L_mismatch) == 0 and len(R_mismatch) == 0:
+                    mismatch_row.append(None)
+                else:
+                    mismatch_row.append([L_mismatch, R_mismatch])
+            mismatch_sink.write(mismatch_row)
+            # Wider rows
+            for append in ['', '_AUTO_omit', '_AUTO_add']:
+                wider_row = [type_key+append]
+                for ID_key in ID_keys:
+                    if append == '':
+                        index = 'overlap'
+                    if append == '_AUTO_omit':
+                        index = f'{ID_key} L unique'
+                    if append == '_AUTO_add':
+                        index = f'{ID_key} R unique'
+                    wider_row.append(type_results[ID_key][index])
+                wider_sink.write(wider_row)
     return all_results, data_manual, data_auto
 
-def intake_comparison_overlap(comparison_overlap_path):
+def intake_comparison_overlap(comparison_overlap_path, output_dir='.', 
+                              output_file='overlap_data_long.csv',
+                              as_frame=False):
     """
     imports a csv with analyses overlap labels as index and participant IDs
     as column labels. Data are lists of elements overlapping across manual
-    and AutoPATT data.
+    and AutoPATT data. Long data (ID, analysis, IPA) are streamed to 
+    output_file in output_dir. Cells that cannot be read as lists or tuples
+    are reported and skipped.
+    
+    Parameters:
+        as_frame : bool, set to True to also collect the long data and 
+                   return them as a DataFrame. Default = False
+    
+    Returns path to output_file, or a DataFrame of the long data if 
+    as_frame is True.
     """
     # Import raw data
     raw_df = pd.read_csv(comparison_overlap_path, encoding='utf-8', index_col=0)
     
     # Convert
-    long_tuples = []
-    for col in raw_df.iteritems():
-        for cell in col[1].iteritems():           
-            pass
-            try:    
-                overlap = ast.literal_eval(cell[1])
-            except ValueError:
-                error_col = col
-                error_cell = cell
-                print(f"ERROR: {cell[1]}")
-            for element in overlap:
-                cur_tuple = (col[0], cell[0], element)
-                long_tuples.append(cur_tuple)
-
-    new_df = pd.DataFrame(long_tuples, columns=['ID', 'analysis', 'IPA'])
-    new_df.set_index(['ID', 'analysis'], inplace=True)
-    new_df.to_csv('overlap_data_long.csv', encoding='utf-8')
-    return new_df
+    rows = []
+    with open_sink(output_file, ['ID', 'analysis', 'IPA'], 
+                   output_dir=output_dir) as sink:
+        for col in raw_df.items():
+            for cell in col[1].items():           
+                try:    
+                    overlap = ast.literal_eval(cell[1])
+                except (ValueError, SyntaxError):
+                    print(f"ERROR: {cell[1]}")
+                    continue
+                if not isinstance(overlap, (list, tuple)):
+                    print(f"ERROR: {cell[1]}")
+                    continue
+                for element in overlap:
+                    row = (col[0], cell[0], element)
+                    sink.write(row)
+                    if as_frame:
+                        rows.append(row)
+    if as_frame:
+        return pd.DataFrame(rows, columns=sink.columns)
+    return sink.path
     
 ###
 # Use Case
@@ -113,6 +135,9 @@ all_results, data_manual, data_auto = validation_proj_data(dir_manual_data, dir_
 
 ### intake_comparison_overlap()
 # comparison_overlap_path = "E:\My Drive\Phonological Typologies Lab\Projects\AutoPATT\Manual PATT Validation\Processed Data\manual_edits\overlap_comparison_data.csv"
-# overlap_data_long = intake_comparison_overlap(comparison_overlap_path)
+# Returns the path to the long csv. Previously the long DataFrame was
+# returned; use as_frame=True to get it.
+# overlap_data_long_path = intake_comparison_overlap(comparison_overlap_path)
+# overlap_data_long = intake_comparison_overlap(comparison_overlap_path, as_frame=True)
 
 
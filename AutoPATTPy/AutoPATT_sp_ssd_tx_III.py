@@ -18,6 +18,7 @@ import re
 import pandas as pd
 
 from AutoPATTPy import AutoPATT, change_dir
+from sinks import open_sink
 
 ###
 ###
@@ -52,23 +53,37 @@ def import_files_SpTx(directory):
                     continue
     return [autopatt_objs, [set(ID_set), set(phase_set), set(lang_set)]]
 
-def export(input, vars = ['phonetic_inv', 'phonemic_inv', 'cluster_inv'], cells="segment", output="autopatt_data.csv"):
+def export(input, vars = ['phonetic_inv', 'phonemic_inv', 'cluster_inv'], cells="segment", output="autopatt_data.csv", output_dir=None, as_frame=False):
+    """Exports AutoPATT variables to output in output_dir, one row (ID, 
+    variable, value) per AutoPATT object and variable, written as each is
+    produced. The output format is chosen by extension, see sinks.open_sink.
+    
+    Returns path to output, or a DataFrame of the exported rows if as_frame
+    is True."""
     ap_dict = input[0]
-    var_list = []
-    for ap in ap_dict.keys():
-        for v in vars:          
-            try:  
-                var = ap_dict[ap].var_to_df(v, cells="segment")
-                var_list.append(var)
-            except AttributeError:
-                print(f"{v} not found as an AutoPATT variable. Exiting.")
-                exit()
-    df = pd.DataFrame()
-    for v in var_list:
-        df[v.name] = v
-    df.to_csv(output, encoding="utf-8", index=False)
-    print(f"AutoPATT data saved to {os.path.join(os.getcwd(), output)}")
-    return df
+    rows = []
+    with open_sink(output, ['ID', 'variable', 'value'], output_dir=output_dir) as sink:
+        for ap in ap_dict.keys():
+            for v in vars:          
+                try:  
+                    var = ap_dict[ap].var_to_df(v, cells=cells)
+                except AttributeError:
+                    print(f"{v} not found as an AutoPATT variable. Exiting.")
+                    exit()
+                if var is None:
+                    value = None
+                elif cells == "segment":
+                    value = var.iloc[0]
+                else:
+                    value = list(var)
+                row = (ap, v, value)
+                sink.write(row)
+                if as_frame:
+                    rows.append(row)
+    print(f"AutoPATT data saved to {sink.path}")
+    if as_frame:
+        return pd.DataFrame(rows, columns=sink.columns)
+    return sink.path
         
         
 def compare_all_SpTx(directory):
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Cluster tokenization and array-backed cluster inventories.
+
+Cluster strings from AutoPATT output (e.g. 'tʰɹ', 'ɡʷl', 't͡sl') are split
+into segments once, with diacritics, modifier letters and tie bars kept with
+their base segment. Segments are mapped to integer IDs shared by all
+AutoPATT objects, and tokenized clusters are cached globally, so repeated
+cluster queries across a cohort do not re-tokenize the same strings.
+
+# Use example:
+segment_names(tokenize('tʰɹ'))      # ('tʰ', 'ɹ')
+clusters = myAutoPATTsession.cluster_array('cluster_inv')
+clusters.sizes()                    # number of segments in each cluster
+clusters.with_segment('l')          # e.g. ['pl', 'ɡʷl']
+
+@author: Philip
+"""
+
+import unicodedata
+from array import array
+from functools import lru_cache
+
+# Combining tie bars joining the next base character to the current segment
+TIE_BARS = {'͡', '͜'}
+
+# Global segment table: SEGMENTS[segment ID] = segment string
+SEGMENTS = []
+SEGMENT_IDS = {}
+
+
+def segment_id(segment):
+    """Returns the integer ID of a segment string, adding it if new."""
+    try:
+        return SEGMENT_IDS[segment]
+    except KeyError:
+        SEGMENT_IDS[segment] = len(SEGMENTS)
+        SEGMENTS.append(segment)
+        return SEGMENT_IDS[segment]
+
+
+def segment_names(ids):
+    """Returns tuple of segment strings for a sequence of segment IDs."""
+    return tuple(SEGMENTS[i] for i in ids)
+
+
+def split_segments(cluster):
+    """
+    Splits an IPA cluster string into a tuple of segment strings.
+
+    Combining diacritics, modifier letters (e.g. ʰ, ʷ, ː) and modifier
+    symbols attach to the preceding segment. A tie bar also attaches the
+    following character. Whitespace is ignored.
+    """
+    segments = []
+    tied = False
+    for char in cluster:
+        if char.isspace():
+            continue
+        attach = (tied or unicodedata.combining(char)
+                  or unicodedata.category(char) in ('Lm', 'Sk'))
+        if attach and segments:
+            segments[-1] += char
+        else:
+            segments.append(char)
+        tied = char in TIE_BARS
+    return tuple(segments)
+
+
+@lru_cache(maxsize=None)
+def tokenize(cluster):
+    """Returns a cluster string as a tuple of segment IDs. Results are cached
+    for all AutoPATT objects. See split_segments."""
+    return tuple(segment_id(s) for s in split_segments(cluster))
+
+
+class ClusterArray(object):
+    """
+    Array-backed inventory of tokenized clusters.
+
+    Segment IDs of all clusters are stored end to end in ids, with cluster
+    i spanning ids[offsets[i]:offsets[i+1]].
+
+    Attributes:
+        clusters: list of cluster strings
+        ids: array of segment IDs
+        offsets: array of start positions of each cluster in ids, plus the
+            total length
+
+    Segment IDs are only valid for the global segment table of the current
+    process, so only clusters is pickled and the arrays are rebuilt on
+    unpickling.
+    """
+    def __init__(self, clusters):
+        """
+        Parameters:
+            clusters : list of cluster strings, e.g. AutoPATT.cluster_inv.
+                       None and empty strings are skipped.
+        """
+        self.clusters = [c for c in clusters or [] if c and c.strip()]
+        self.ids = array('I')
+        self.offsets = array('I', [0])
+        for cluster in self.clusters:
+            self.ids.extend(tokenize(cluster))
+            self.offsets.append(len(self.ids))
+
+    def __getstate__(self):
+        return {'clusters': self.clusters}
+
+    def __setstate__(self, state):
+        self.__init__(state['clusters'])
+
+    def __repr__(self):
+        return f'ClusterArray of {len(self)} clusters'
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def __getitem__(self, i):
+        """Returns tuple of segment IDs of cluster i. Negative indices count
+        from the end, as for lists."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('ClusterArray index out of range')
+        return tuple(self.ids[self.offsets[i]:self.offsets[i+1]])
+
+    def segments(self, i):
+        """Returns tuple of segment strings of cluster i."""
+        return segment_names(self[i])
+
+    def sizes(self):
+        """Returns array of the number of segments in each cluster."""
+        return array('H', (self.offsets[i+1] - self.offsets[i]
+                           for i in range(len(self))))
+
+    def segment_set(self):
+        """Returns set of segment strings occurring in any cluster."""
+        return set(segment_names(set(self.ids)))
+
+    def with_segment(self, segment):
+        """Returns list of clusters containing segment (str)."""
+        seg = SEGMENT_IDS.get(segment)
+        if seg is None:
+            return []
+        return [c for i, c in enumerate(self.clusters) if seg in self[i]]
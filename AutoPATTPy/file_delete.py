@@ -1,30 +1,135 @@
 # -*- coding: utf-8 -*-
 """
+Prunes a directory of files down to those matching a list of IDs.
+
+The directory is listed once and every filename is matched against all IDs
+with a single compiled alternation regex, so large directories with hundreds
+of IDs do not require one directory listing per ID.
+
+# Use example:
+plan = prune_plan(directory, id_list)
+prune_files(directory, id_list)                       # dry run, prints plan
+prune_files(directory, id_list, dry_run=False)        # deletes
+prune_files(directory, id_list, dry_run=False, trash_dir='pruned')  # moves
+
 Created on Fri Oct  2 08:08:20 2020
 @author: Philip
 """
 import os
+import re
+import shutil
+
+
+def id_matcher(id_list):
+    """Compiles a list of IDs into a single alternation regex.
+
+    IDs are matched as plain substrings of filenames, so an ID of '10' also
+    matches '1049_x.csv'. Empty and whitespace-only IDs are ignored.
+
+    Returns compiled regex, or None if id_list contains no usable IDs.
+    Raises TypeError if id_list is a single string rather than a list of IDs.
+    """
+    if isinstance(id_list, (str, bytes)):
+        raise TypeError('id_list must be a list of IDs, not a single string')
+    ids = {str(i).strip() for i in id_list}
+    ids.discard('')
+    if not ids:
+        return None
+    # Sorted only so the compiled pattern is the same on every run
+    return re.compile('|'.join(re.escape(i) for i in sorted(ids)))
+
+
+def prune_plan(directory, id_list):
+    """
+    Builds a keep/delete plan for the files in a directory.
+
+    Parameters:
+        directory : path to directory of files to be pruned
+        id_list : iterable of IDs (str). Files whose name contains any ID are
+                  kept, all other files are marked for deletion.
+
+    Returns dictionary with sorted 'keep' and 'delete' lists of filenames.
+    Subdirectories are never included in the plan.
+    """
+    matcher = id_matcher(id_list)
+    plan = {'keep': [], 'delete': []}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if matcher is not None and matcher.search(entry.name):
+                plan['keep'].append(entry.name)
+            else:
+                plan['delete'].append(entry.name)
+    plan['keep'].sort()
+    plan['delete'].sort()
+    return plan
+
+
+def prune_files(directory, id_list, dry_run=True, trash_dir=None, force=False):
+    """
+    Deletes all files in a directory whose name does not contain an ID.
 
-id_list = input('Enter ID list:').split('\n')
+    Parameters:
+        directory : path to directory of files to be pruned
+        id_list : iterable of IDs (str) identifying files to keep
+        dry_run : bool, set to False to actually remove files. When True, the
+                  plan is only printed. Default = True
+        trash_dir : path to a directory to move pruned files into instead of
+                    deleting them. Relative paths are resolved against
+                    directory. Created if it does not exist. Files already
+                    in trash_dir are never overwritten; a pruned file with 
+                    the same name is moved as 'name (1).ext', etc. 
+                    Default = None
+        force : bool, set to True to prune even if id_list has no usable IDs
+                or no file would be kept. Default = False
 
-os.chdir(r'C:\Users\Philip\Documents\DPA Excel')
+    Returns the plan dictionary produced by prune_plan().
+    Raises ValueError if id_list has no usable IDs, or if every file would be
+    pruned, unless force is True.
+    """
+    if id_matcher(id_list) is None and not force:
+        raise ValueError('ID list contains no usable IDs. '
+                         'Use force=True to prune all files.')
+    plan = prune_plan(directory, id_list)
+    if not plan['keep'] and plan['delete'] and not force:
+        raise ValueError('No files match the ID list. '
+                         'Use force=True to prune all files.')
+    if trash_dir is not None:
+        trash_dir = os.path.join(directory, trash_dir)
+    action = 'Moving' if trash_dir else 'Deleting'
+    print(f"Keeping {len(plan['keep'])} files, "
+          f"{action.lower()} {len(plan['delete'])} files in {directory}")
+    if dry_run:
+        for fname in plan['delete']:
+            print(f'[dry run] {action} {fname}')
+        return plan
+    if trash_dir:
+        os.makedirs(trash_dir, exist_ok=True)
+    for fname in plan['delete']:
+        path = os.path.join(directory, fname)
+        if trash_dir:
+            shutil.move(path, _trash_path(trash_dir, fname))
+        else:
+            os.remove(path)
+    print('Done.')
+    return plan
 
-print(os.getcwd())
 
-save_file_list = []
-for id in id_list:
-    for fname in os.listdir():
-        if id in fname:
-            print(fname)
-            save_file_list.append(fname)
+def _trash_path(trash_dir, fname):
+    """Returns a path in trash_dir for fname that does not exist yet."""
+    path = os.path.join(trash_dir, fname)
+    stem, ext = os.path.splitext(fname)
+    n = 1
+    while os.path.lexists(path):
+        path = os.path.join(trash_dir, f'{stem} ({n}){ext}')
+        n += 1
+    return path
 
-delete_list = []
-for fname in os.listdir():
-    if fname not in save_file_list:
-        delete_list.append(fname)
-        
-for fname in delete_list:
-    pass
-    os.remove(fname)
 
-os.close()
+if __name__ == '__main__':
+    directory = input('Enter directory:')
+    id_list = input('Enter ID list (comma separated):').split(',')
+    plan = prune_files(directory, id_list, dry_run=True)
+    if plan['delete'] and input("To delete these files, input OK: ") == 'OK':
+        prune_files(directory, id_list, dry_run=False)
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Session-metadata index for filtering AutoPATT outputs before a full parse.
+
+Only the session/metadata block at the top of each output is read, so large
+directories or archives can be filtered by language, AutoPATT version,
+analysis date, etc. and only matching outputs parsed with AutoPATT.
+Requires AutoPATT output >= v0.7; outputs without a metadata block (legacy)
+are indexed with empty metadata.
+
+# Use example:
+index = MetadataIndex(directory_of_outputs)
+index.query(lang='Spanish', min_version=0.7, analyzed_after='2022-12-31')
+data = index.load(lang='Spanish', min_version=0.7, analyzed_after='2022-12-31')
+
+# Use example: persistent index
+index = MetadataIndex('outputs.zip', db_path='outputs_index.db')
+
+@author: Philip
+"""
+
+import datetime
+import io
+import os
+import sqlite3
+
+from AutoPATTPy import (AutoPATT, _iter_archive_members, _unique_id,
+                        clean_rows, parse_session_info)
+
+# Row following the metadata block. Reading stops here.
+HEADER_END = 'PHONETIC INVENTORY:'
+
+# Analysis date formats tried, in order, when normalizing to ISO dates
+DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%m/%d/%y', '%d.%m.%Y']
+
+
+def read_header(infile):
+    """
+    Reads the session/metadata block of an AutoPATT output.
+
+    Parameters:
+        infile : path to AutoPATT output, or a text or binary file object
+
+    Returns dictionary of version, lang, session, corpus, total_records,
+    records, analysis_date and analysis_time (see AutoPATT), or an empty
+    dictionary if the output has no metadata block.
+    """
+    if isinstance(infile, (str, os.PathLike)):
+        with io.open(infile, mode='r', encoding='utf-8') as f:
+            return read_header(f)
+    if not isinstance(infile, io.TextIOBase):
+        infile = io.TextIOWrapper(infile, encoding='utf-8')
+    lines = []
+    for line in infile:
+        if line.strip().strip(',').replace('"', '') == HEADER_END:
+            break
+        lines.append(line)
+    try:
+        info = parse_session_info(clean_rows(lines))
+    except (ValueError, IndexError):
+        return {}
+    return info
+
+
+def normalize_date(date):
+    """Returns date as a YYYY-MM-DD string, or None if its format is not one
+    of DATE_FORMATS."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(date, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+class MetadataIndex(object):
+    """
+    Queryable SQLite index of AutoPATT output metadata.
+    """
+    columns = ['ID', 'source', 'archive', 'version', 'lang', 'session',
+               'corpus', 'total_records', 'analysis_date', 'analysis_time']
+
+    def __init__(self, path=None, db_path=':memory:'):
+        """
+        Parameters:
+            path : path to a directory or zip/tar archive of AutoPATT outputs
+                   to index (optional). See add().
+            db_path : path to SQLite database file for a persistent index.
+                      Default = ':memory:'
+
+        Index columns:
+            ID : output file name without the .csv extension
+            source : path to output file, or member name within archive
+            archive : path to archive containing source, or NULL
+            version, lang, total_records, analysis_time : see AutoPATT
+            analysis_date : YYYY-MM-DD, or NULL if the date format is not
+                one of DATE_FORMATS
+            session, corpus : comma-separated sessions and corpora
+        
+        Each output (source and archive) is indexed once. Adding a path
+        again replaces its existing rows.
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS metadata (ID TEXT, source TEXT, '
+            'archive TEXT, version REAL, lang TEXT, session TEXT, '
+            'corpus TEXT, total_records INTEGER, analysis_date TEXT, '
+            'analysis_time TEXT)')
+        self.conn.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS metadata_source ON metadata '
+            "(source, IFNULL(archive, ''))")
+        if path is not None:
+            self.add(path)
+
+    def __repr__(self):
+        return f'MetadataIndex of {len(self)} AutoPATT outputs'
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM metadata').fetchone()[0]
+
+    def add(self, path):
+        """Indexes all .csv AutoPATT outputs in a directory or zip/tar
+        archive. Only the metadata block of each output is read."""
+        path = os.path.abspath(path)
+        rows = []
+        if os.path.isfile(path):
+            for member, infile in _iter_archive_members(path):
+                with infile:
+                    rows.append(self._row(member, path, read_header(infile)))
+        else:
+            for f in os.listdir(path):
+                if f.endswith('.csv'):
+                    source = os.path.join(path, f)
+                    rows.append(self._row(source, None, read_header(source)))
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO metadata VALUES '
+            f"({', '.join('?' * len(self.columns))})", rows)
+        self.conn.commit()
+        print(f'{len(rows)} AutoPATT outputs added to index')
+        i_date = self.columns.index('analysis_date')
+        i_version = self.columns.index('version')
+        undated = [row[1] for row in rows 
+                   if row[i_date] is None and row[i_version] is not None]
+        if undated:
+            print(f'WARNING: {len(undated)} outputs have an unrecognized '
+                  'analysis date format and are excluded by date filters: '
+                  f"{', '.join(undated)}")
+
+    @staticmethod
+    def _row(source, archive, info):
+        ID = os.path.basename(source).replace('.csv', '')
+        return (ID, source, archive, info.get('version'), info.get('lang'),
+                ','.join(info.get('session', [])),
+                ','.join(info.get('corpus', [])), info.get('total_records'),
+                normalize_date(info['analysis_date']) if info else None,
+                info.get('analysis_time'))
+
+    def query(self, lang=None, min_version=None, max_version=None,
+              analyzed_after=None, analyzed_before=None, session=None,
+              corpus=None, where=None, params=()):
+        """
+        Returns list of dictionaries of index rows matching all filters.
+
+        Parameters:
+            lang : str, language of analysis
+            min_version, max_version : float, inclusive AutoPATT version range
+            analyzed_after, analyzed_before : str 'YYYY-MM-DD' or
+                datetime.date, exclusive analysis date range. Outputs with 
+                an unrecognized analysis date never match.
+            session, corpus : str, session or corpus included in the output
+            where : str, additional SQL condition on index columns, e.g.
+                    'total_records >= ?'
+            params : sequence of parameters for where
+        """
+        if analyzed_after is not None:
+            analyzed_after = str(analyzed_after)
+        if analyzed_before is not None:
+            analyzed_before = str(analyzed_before)
+        conditions = []
+        values = []
+        for column, op, value in [('lang', '=', lang),
+                                  ('version', '>=', min_version),
+                                  ('version', '<=', max_version),
+                                  ('analysis_date', '>', analyzed_after),
+                                  ('analysis_date', '<', analyzed_before)]:
+            if value is not None:
+                conditions.append(f'{column} {op} ?')
+                values.append(value)
+        for column, value in [('session', session), ('corpus', corpus)]:
+            if value is not None:
+                conditions.append(f"instr(',' || {column} || ',', ?) > 0")
+                values.append(f',{value},')
+        if where:
+            conditions.append(f'({where})')
+            values.extend(params)
+        sql = 'SELECT * FROM metadata'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        cursor = self.conn.execute(sql, values)
+        return [dict(zip(self.columns, row)) for row in cursor]
+
+    def load(self, legacy=False, robust=False, **filters):
+        """
+        Parses the outputs matching filters (see query) as AutoPATT objects.
+
+        Returns dictionary of AutoPATT objects. Outputs sharing a file name
+        are keyed by their path (archive member path) without .csv after
+        the first, as in AutoPATTPy.iter_archive.
+        """
+        autopatt_objs = {}
+        archives = {}
+        seen = set()
+        for row in self.query(**filters):
+            if row['archive'] is None:
+                ID = _unique_id(row['source'], seen)
+                autopatt_objs[ID] = AutoPATT(
+                    row['source'], legacy=legacy, robust=robust, name=ID)
+            else:
+                archives.setdefault(row['archive'], set()).add(row['source'])
+        for archive, members in archives.items():
+            for member, infile in _iter_archive_members(archive):
+                with infile:
+                    if member not in members:
+                        continue
+                    ID = _unique_id(member, seen)
+                    autopatt = AutoPATT(infile, legacy=legacy, robust=robust,
+                                        name=ID)
+                autopatt.file_location = None
+                autopatt.source = os.path.join(archive, member)
+                autopatt_objs[ID] = autopatt
+        print('AutoPATT objects added to dictionary')
+        return autopatt_objs
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Result sinks for writing AutoPATTPy results to disk as they are produced.
+
+Rows are buffered and written in batches, so comparison and export pipelines
+can stream results without assembling a full DataFrame in memory.
+
+# Use example:
+with open_sink('results.csv', ['ID', 'analysis', 'IPA'], output_dir=out) as sink:
+    sink.write(('S101', 'phonetic_inv', 'p'))
+    sink.write({'ID': 'S101', 'analysis': 'phonetic_inv', 'IPA': 'b'})
+
+Supported formats, chosen by file extension in open_sink():
+    .csv : CSVSink
+    .parquet : ParquetSink (requires pyarrow)
+    .db, .sqlite, .sqlite3 : SQLiteSink
+    .jsonl : JSONLinesSink
+
+@author: Philip
+"""
+
+import csv
+import json
+import os
+import sqlite3
+
+
+class ResultSink(object):
+    """
+    Base class for buffered result sinks. Subclasses implement _open(),
+    _write_batch() and _close().
+    """
+    def __init__(self, path, columns, batch_size=1000):
+        """
+        Parameters:
+            path : str, path to output file. Parent directories are created.
+            columns : list of column names (str)
+            batch_size : int, number of rows buffered before each write.
+                         Default = 1000
+        """
+        self.path = os.path.abspath(path)
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer = []
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._open()
+
+    def __repr__(self):
+        return f'{type(self).__name__} {self.path}'
+
+    def write(self, row):
+        """Appends a row, given as a sequence in column order or a dict."""
+        if isinstance(row, dict):
+            row = [row.get(c) for c in self.columns]
+        self._buffer.append(tuple(row))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, rows):
+        """Appends an iterable of rows. See write()."""
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        """Writes all buffered rows."""
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """Flushes buffered rows and closes the output file."""
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_batch(self, rows):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class CSVSink(ResultSink):
+    """Writes rows to a utf-8 csv file with a header row. Non-string values
+    are written as their str() representation, as pandas.to_csv does."""
+    def _open(self):
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+        self._writer.writerow(self.columns)
+
+    def _write_batch(self, rows):
+        self._writer.writerows(rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONLinesSink(ResultSink):
+    """Writes each row as a JSON object on its own line. Lists and dicts are
+    kept as JSON arrays and objects."""
+    def _open(self):
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def _write_batch(self, rows):
+        self._file.writelines(
+            json.dumps(dict(zip(self.columns, row)), ensure_ascii=False,
+                       default=str) + '\n' for row in rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class SQLiteSink(ResultSink):
+    """Writes rows to a table in an SQLite database. An existing table of the
+    same name is replaced. Values other than str, int, float and None are
+    stored as their str() representation."""
+    def __init__(self, path, columns, batch_size=1000, table='results'):
+        self.table = table
+        super().__init__(path, columns, batch_size=batch_size)
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.path)
+        cols = ', '.join(_quote(c) for c in self.columns)
+        self._conn.execute(f'DROP TABLE IF EXISTS {_quote(self.table)}')
+        self._conn.execute(f'CREATE TABLE {_quote(self.table)} ({cols})')
+        params = ', '.join('?' * len(self.columns))
+        self._insert = f'INSERT INTO {_quote(self.table)} VALUES ({params})'
+
+    def _write_batch(self, rows):
+        self._conn.executemany(
+            self._insert, ([_scalar(v) for v in row] for row in rows))
+        self._conn.commit()
+
+    def _close(self):
+        self._conn.close()
+
+
+class ParquetSink(ResultSink):
+    """Writes rows to a Parquet file, one row group per batch. All columns
+    are stored as strings (None as null). Requires pyarrow."""
+    def _open(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('pyarrow is required for parquet output')
+        self._pa = pa
+        self._schema = pa.schema([(c, pa.string()) for c in self.columns])
+        self._writer = pq.ParquetWriter(self.path, self._schema)
+
+    def _write_batch(self, rows):
+        arrays = [self._pa.array([None if v is None else str(v) for v in col],
+                                 type=self._pa.string())
+                  for col in zip(*rows)]
+        self._writer.write_table(
+            self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def _close(self):
+        self._writer.close()
+
+
+SINKS = {'.csv': CSVSink,
+         '.parquet': ParquetSink,
+         '.db': SQLiteSink,
+         '.sqlite': SQLiteSink,
+         '.sqlite3': SQLiteSink,
+         '.jsonl': JSONLinesSink}
+
+
+def open_sink(filename, columns, output_dir=None, batch_size=1000, **kwargs):
+    """
+    Opens a result sink for filename, chosen by its extension (see SINKS).
+
+    Parameters:
+        filename : str, output file name or path
+        columns : list of column names (str)
+        output_dir : path to directory for output. Default = None, current
+                     working directory or the directory in filename
+        batch_size : int, number of rows buffered before each write.
+                     Default = 1000
+        **kwargs : passed to the sink, e.g. table for SQLiteSink
+
+    Returns ResultSink
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    try:
+        sink = SINKS[ext]
+    except KeyError:
+        raise ValueError(f'No sink for {ext or filename} output. '
+                         f"Use one of: {', '.join(SINKS)}")
+    if output_dir is not None:
+        filename = os.path.join(output_dir, filename)
+    return sink(filename, columns, batch_size=batch_size, **kwargs)
+
+
+def _quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _scalar(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+AutoPATTPy modules import each other as top-level modules, so the package
+directory is added to sys.path for the tests.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'AutoPATTPy'))
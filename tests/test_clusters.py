@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for cluster tokenization and ClusterArray.
+"""
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from AutoPATTPy import AutoPATT
+from clusters import ClusterArray, segment_names, split_segments, tokenize
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(TESTS, 'corpus')
+
+
+@pytest.mark.parametrize('cluster, segments', [
+    ('pl', ('p', 'l')),
+    ('skw', ('s', 'k', 'w')),
+    ('tʰɹ', ('tʰ', 'ɹ')),
+    ('ɡʷl', ('ɡʷ', 'l')),
+    ('t͡sl', ('t͡s', 'l')),
+    ('d͜ʒɹ', ('d͜ʒ', 'ɹ')),
+    ('kːw', ('kː', 'w')),
+    ('n̥t̪', ('n̥', 't̪')),
+    (' s n ', ('s', 'n')),
+    ('', ())])
+def test_split_segments(cluster, segments):
+    assert split_segments(cluster) == segments
+
+
+def test_tokenize_is_cached_and_shared():
+    assert tokenize('tʰɹ') is tokenize('tʰɹ')
+    assert segment_names(tokenize('tʰɹ')) == ('tʰ', 'ɹ')
+    assert tokenize('tʰɹ')[0] == tokenize('tʰw')[0]
+
+
+def test_cluster_array():
+    clusters = ClusterArray(['pl', '', None, 'tʰɹ', 'skw'])
+    assert len(clusters) == 3
+    assert list(clusters.sizes()) == [2, 2, 3]
+    assert clusters.segments(1) == ('tʰ', 'ɹ')
+    assert clusters.with_segment('w') == ['skw']
+    assert clusters.with_segment('ʒ') == []
+    assert clusters.segment_set() == {'p', 'l', 'tʰ', 'ɹ', 's', 'k', 'w'}
+
+
+def test_cluster_array_indexing():
+    clusters = ClusterArray(['pl', 'tʰɹ'])
+    assert clusters[-1] == clusters[1] == tokenize('tʰɹ')
+    assert clusters[-2] == clusters[0]
+    for i in [2, -3]:
+        with pytest.raises(IndexError):
+            clusters[i]
+
+
+def test_autopatt_cluster_array():
+    autopatt = AutoPATT(os.path.join(CORPUS, 'v07_multi_session_crlf.csv'))
+    clusters = autopatt.cluster_array()
+    assert clusters is autopatt.cluster_array('cluster_inv')
+    assert clusters.segments(3) == ('t͡s', 'l')
+    out = autopatt.cluster_array('out_clusters')
+    assert out.segments(3) == ('kʷ', 'l')
+
+
+def test_autopatt_cluster_array_pickle(tmp_path):
+    autopatt = AutoPATT(os.path.join(CORPUS, 'v07_multi_session_crlf.csv'))
+    autopatt.cluster_array()
+    path = tmp_path / 'autopatt.pkl'
+    path.write_bytes(pickle.dumps(autopatt))
+    # Fresh process with a different segment table: IDs must be rebuilt
+    script = (
+        'import pickle, sys\n'
+        'from clusters import tokenize\n'
+        "tokenize('ʀʁʂ')\n"
+        'autopatt = pickle.loads(open(sys.argv[1], "rb").read())\n'
+        "print(' '.join(autopatt.cluster_array().segments(3)))\n")
+    env = dict(os.environ, PYTHONPATH=os.path.join(
+        os.path.dirname(TESTS), 'AutoPATTPy'), PYTHONIOENCODING='utf-8')
+    result = subprocess.run([sys.executable, '-c', script, str(path)],
+                            capture_output=True, env=env, check=True)
+    assert result.stdout.decode('utf-8').strip() == 't͡s l'
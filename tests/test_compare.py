@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for comparing AutoPATT objects.
+"""
+import csv
+import os
+
+import pytest
+
+from AutoPATTPy import ANALYSIS_LIST, AutoPATT, compare_all, compare_all_chunked
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+ROBUST = os.path.join(CORPUS, 'v07_robust.csv')
+
+
+def test_compare_identical_parse_short_circuits():
+    left = AutoPATT(ROBUST)
+    right = AutoPATT(ROBUST)
+    assert left.same_parse(right)
+    result = left.compare(right, 'phonetic_inv')
+    assert result['overlap'] == left.phonetic_inv
+    assert result['v07_robust L unique'] == []
+    assert result['v07_robust R unique'] == []
+
+
+def test_compare_same_content_different_robust_setting():
+    manual = AutoPATT(ROBUST, robust=True)
+    auto = AutoPATT(ROBUST)
+    assert manual.content_hash == auto.content_hash
+    assert not manual.same_parse(auto)
+    result = manual.compare(auto, 'phonetic_inv')
+    assert result['v07_robust L unique'] == ['ɡ']
+    assert result['v07_robust R unique'] == ['g']
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_compare_all_chunked_reports_one_sided_keys(tmp_path):
+    left = {'S1': AutoPATT(ROBUST), 'L_only': AutoPATT(ROBUST)}
+    right = {'S1': AutoPATT(ROBUST, robust=True), 'R_only': AutoPATT(ROBUST)}
+    missing = compare_all_chunked(left, right, 'results.csv', chunk_size=1,
+                                  output_dir=str(tmp_path))
+    assert missing == {'L only': ['L_only'], 'R only': ['R_only']}
+    rows = read_rows(tmp_path / 'results.csv')
+    assert {row['ID'] for row in rows} == {'S1'}
+    assert len(rows) == len(ANALYSIS_LIST) * 3
+    phonetic = {row['result']: row['elements'] for row in rows
+                if row['analysis'] == 'phonetic_inv'}
+    assert phonetic == {'overlap': 'p,b,t,d,k,m,n,ŋ',
+                        'L unique': 'g', 'R unique': 'ɡ'}
+
+
+def test_compare_all_chunked_matches_compare_all(tmp_path):
+    left = {name: AutoPATT(os.path.join(CORPUS, name + '.csv'))
+            for name in ['v07_single', 'v07_no_targets', 'v07_robust']}
+    right = {name: AutoPATT(os.path.join(CORPUS, 'v07_single.csv'), name=name)
+             for name in left}
+    expected = compare_all(left, right)
+    compare_all_chunked(left, right, str(tmp_path / 'results.csv'),
+                        chunk_size=2)
+    for row in read_rows(tmp_path / 'results.csv'):
+        result = expected[row['analysis']][row['ID']]
+        key = {'overlap': 'overlap',
+               'L unique': row['ID'] + ' L unique',
+               'R unique': row['ID'] + ' R unique'}[row['result']]
+        assert row['elements'] == ','.join(result[key])
+
+
+@pytest.mark.parametrize('chunk_size', [0, -1, 1.5])
+def test_compare_all_chunked_rejects_bad_chunk_size(tmp_path, chunk_size):
+    data = {'S1': AutoPATT(ROBUST)}
+    with pytest.raises(ValueError, match='chunk_size'):
+        compare_all_chunked(data, data, str(tmp_path / 'results.csv'),
+                            chunk_size=chunk_size)
+    assert not (tmp_path / 'results.csv').exists()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Parser conformance tests against a corpus of synthetic AutoPATT outputs.
+
+Each case in corpus/cases.json names a corpus file, the AutoPATT options it
+is parsed with (legacy, robust, and whether it is first repaired with
+csv_repair), and a timing budget. corpus/golden.json
+holds the expected parsed attributes for each case. Golden outputs record the
+parser's current behaviour, including quirks such as an empty cluster
+inventory row picking up the TARGETS heading (v07_empty_clusters); a parser
+change that alters them must update golden.json deliberately.
+
+Timing budgets are ratios to a baseline read of the same file with
+csv.reader in the same run, so they do not depend on machine speed. Each
+budget_ratio is about twice the ratio measured when it was set (1.9-2.7).
+"""
+import io
+import json
+import os
+import shutil
+import csv
+import time
+import zipfile
+
+import pytest
+
+from AutoPATTPy import AutoPATT, import_files, iter_archive
+from csv_repair import csv_repair
+from metadata_index import read_header
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+with open(os.path.join(CORPUS, 'cases.json'), encoding='utf-8') as f:
+    CASES = json.load(f)
+with open(os.path.join(CORPUS, 'golden.json'), encoding='utf-8') as f:
+    GOLDEN = json.load(f)
+
+# Parsed attributes compared with golden outputs
+ATTRS = ['name', 'version', 'lang', 'session', 'corpus', 'total_records',
+         'records', 'analysis_date', 'analysis_time', 'phonetic_inv',
+         'minimal_pairs', 'phonemic_inv', 'cluster_inv', 'targets',
+         'out_phones', 'out_phonemes', 'out_clusters']
+
+# Metadata block attributes, absent for legacy output
+SESSION_ATTRS = ['version', 'lang', 'session', 'corpus', 'total_records',
+                 'records', 'analysis_date', 'analysis_time']
+
+# Timing budgets are checked against the best of this many parses
+TIMING_REPEATS = 20
+
+
+def parsed_attrs(autopatt):
+    return {x: getattr(autopatt, x) for x in ATTRS if hasattr(autopatt, x)}
+
+
+def parse(case, source, **kwargs):
+    return AutoPATT(source, legacy=case['legacy'], robust=case['robust'],
+                    **kwargs)
+
+
+@pytest.fixture(params=sorted(CASES))
+def case(request, tmp_path):
+    """Corpus case with 'path' set to the file to parse. Files needing
+    repair are copied to a temporary directory and repaired there."""
+    case = dict(CASES[request.param], id=request.param)
+    case['path'] = os.path.join(CORPUS, case['file'])
+    if case['repair']:
+        repair_dir = tmp_path / 'repair'
+        repair_dir.mkdir()
+        case['path'] = shutil.copy(case['path'], repair_dir)
+        csv_repair(case['path'])
+    return case
+
+
+def test_golden_attributes(case):
+    assert parsed_attrs(parse(case, case['path'])) == GOLDEN[case['id']]
+
+
+@pytest.mark.parametrize('adapter', ['bytes', 'text stream', 'binary stream'])
+def test_input_adapters_match_golden(case, adapter):
+    with open(case['path'], 'rb') as f:
+        data = f.read()
+    source = {'bytes': data,
+              'text stream': io.StringIO(data.decode('utf-8')),
+              'binary stream': io.BytesIO(data)}[adapter]
+    name = GOLDEN[case['id']]['name']
+    assert parsed_attrs(parse(case, source, name=name)) == GOLDEN[case['id']]
+
+
+@pytest.mark.parametrize('suffix', ['.zip', '.tar.gz'])
+def test_archive_members_match_golden(case, tmp_path, suffix):
+    name = GOLDEN[case['id']]['name']
+    archive = str(tmp_path / ('corpus' + suffix))
+    if suffix == '.zip':
+        with zipfile.ZipFile(archive, 'w') as z:
+            z.write(case['path'], f'outputs/{name}.csv')
+    else:
+        shutil.copy(case['path'], tmp_path / f'{name}.csv')
+        shutil.make_archive(str(tmp_path / 'corpus'), 'gztar',
+                            root_dir=tmp_path, base_dir=f'{name}.csv')
+    parsed = dict(iter_archive(archive, legacy=case['legacy'],
+                               robust=case['robust']))
+    assert list(parsed) == [name]
+    assert parsed_attrs(parsed[name]) == GOLDEN[case['id']]
+
+
+def test_dedup_import_matches_golden(case, tmp_path):
+    name = GOLDEN[case['id']]['name']
+    shutil.copy(case['path'], tmp_path / f'{name}.csv')
+    shutil.copy(case['path'], tmp_path / f'{name}_copy.csv')
+    data = import_files(str(tmp_path), legacy=case['legacy'],
+                        robust=case['robust'], dedup=True)
+    assert parsed_attrs(data[name]) == GOLDEN[case['id']]
+    assert data[f'{name}_copy'].phonetic_inv is data[name].phonetic_inv
+    assert data[f'{name}_copy'].name == f'{name}_copy'
+
+
+def test_header_scan_matches_full_parse(case):
+    expected = {x: GOLDEN[case['id']][x] for x in SESSION_ATTRS
+                if x in GOLDEN[case['id']]}
+    assert read_header(case['path']) == expected
+
+
+def test_csv_repair_is_idempotent(case, tmp_path):
+    path = shutil.copy(case['path'], tmp_path / 'repaired.csv')
+    csv_repair(path)
+    with open(path, 'rb') as f:
+        once = f.read()
+    csv_repair(path)
+    with open(path, 'rb') as f:
+        assert f.read() == once
+
+
+def read_baseline(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+def best_time(func, *args):
+    func(*args)
+    timings = []
+    for _ in range(TIMING_REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_parse_timing_budget(case):
+    baseline = best_time(read_baseline, case['path'])
+    parsed = best_time(parse, case, case['path'])
+    ratio = parsed / baseline
+    assert ratio <= case['budget_ratio'], (
+        f"{case['id']} parsed in {parsed * 1000:.3f} ms, {ratio:.1f}x the "
+        f"csv.reader baseline ({baseline * 1000:.3f} ms), "
+        f"budget {case['budget_ratio']}x")
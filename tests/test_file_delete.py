@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for pruning a directory of files by ID list.
+"""
+import os
+
+import pytest
+
+from file_delete import id_matcher, prune_files, prune_plan
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for fname in ['1049_Pre.csv', '1111.xlsx', '2000.csv', 'notes.txt']:
+        (tmp_path / fname).write_text(fname)
+    (tmp_path / 'subdir').mkdir()
+    return tmp_path
+
+
+def test_id_matcher_is_substring_match():
+    matcher = id_matcher(['10', ' ', ''])
+    assert matcher.search('1049_x.csv')
+    assert not matcher.search('2000.csv')
+
+
+def test_id_matcher_without_usable_ids():
+    assert id_matcher(['', '  ']) is None
+
+
+def test_prune_plan(directory):
+    assert prune_plan(directory, ['1049', '1111']) == {
+        'keep': ['1049_Pre.csv', '1111.xlsx'],
+        'delete': ['2000.csv', 'notes.txt']}
+
+
+def test_dry_run_removes_nothing(directory):
+    before = sorted(os.listdir(directory))
+    plan = prune_files(directory, ['1049', '1111'])
+    assert plan['delete'] == ['2000.csv', 'notes.txt']
+    assert sorted(os.listdir(directory)) == before
+
+
+def test_prune_deletes_unmatched_files(directory):
+    prune_files(directory, ['1049', '1111'], dry_run=False)
+    assert sorted(os.listdir(directory)) == ['1049_Pre.csv', '1111.xlsx',
+                                             'subdir']
+
+
+def test_trash_mode_never_overwrites(directory):
+    prune_files(directory, ['1049'], dry_run=False, trash_dir='trash')
+    (directory / '2000.csv').write_text('second run')
+    prune_files(directory, ['1049'], dry_run=False, trash_dir='trash')
+    trash = directory / 'trash'
+    assert sorted(os.listdir(trash)) == ['1111.xlsx', '2000 (1).csv',
+                                         '2000.csv', 'notes.txt']
+    assert (trash / '2000.csv').read_text() == '2000.csv'
+    assert (trash / '2000 (1).csv').read_text() == 'second run'
+
+
+@pytest.mark.parametrize('id_list', [[], [''], ['  ']])
+def test_no_usable_ids_raises(directory, id_list):
+    with pytest.raises(ValueError):
+        prune_files(directory, id_list, dry_run=False)
+    assert len(os.listdir(directory)) == 5
+
+
+def test_nothing_kept_raises_unless_forced(directory):
+    with pytest.raises(ValueError):
+        prune_files(directory, ['9999'], dry_run=False)
+    assert len(os.listdir(directory)) == 5
+    prune_files(directory, ['9999'], dry_run=False, force=True)
+    assert os.listdir(directory) == ['subdir']
+
+
+def test_single_string_id_list_raises(directory):
+    with pytest.raises(TypeError):
+        prune_plan(directory, '1049')
+    with pytest.raises(TypeError):
+        prune_files(directory, '1049', dry_run=False)
+    assert len(os.listdir(directory)) == 5
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for importing AutoPATT outputs from directories and archives.
+"""
+import os
+import zipfile
+
+import pytest
+
+from AutoPATTPy import duplicate_groups, import_archive
+from metadata_index import MetadataIndex
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+
+@pytest.fixture
+def study_archive(tmp_path):
+    """Zip with the same output file name in two study folders."""
+    archive = str(tmp_path / 'studies.zip')
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.write(os.path.join(CORPUS, 'v07_single.csv'), 'studyA/S1.csv')
+        z.write(os.path.join(CORPUS, 'v07_no_targets.csv'), 'studyB/S1.csv')
+    return archive
+
+
+def test_archive_name_collision_keeps_both(study_archive):
+    data = import_archive(study_archive)
+    assert sorted(data) == ['S1', 'studyB/S1']
+    assert data['S1'].session == ['1111_Pre']
+    assert data['studyB/S1'].session == ['1042']
+    assert data['studyB/S1'].source.endswith('studyB/S1.csv')
+
+
+def test_index_load_name_collision_keeps_both(study_archive):
+    data = MetadataIndex(study_archive).load()
+    assert sorted(data) == ['S1', 'studyB/S1']
+
+
+def test_dedup_reports_copies_between_study_folders(tmp_path):
+    archive = str(tmp_path / 'copies.zip')
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.write(os.path.join(CORPUS, 'v07_single.csv'), 'studyA/S1.csv')
+        z.write(os.path.join(CORPUS, 'v07_single.csv'), 'studyB/S1.csv')
+    data = import_archive(archive, dedup=True)
+    assert list(duplicate_groups(data).values()) == [['S1', 'studyB/S1']]
+    assert data['studyB/S1'].phonetic_inv is data['S1'].phonetic_inv
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the header-only metadata index.
+"""
+import os
+import shutil
+
+import pytest
+
+from metadata_index import MetadataIndex, normalize_date
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+
+@pytest.fixture
+def directory(tmp_path):
+    outputs = tmp_path / 'outputs'
+    outputs.mkdir()
+    for fname in ['v07_single.csv', 'v07_multi_session_crlf.csv',
+                  'legacy.csv']:
+        shutil.copy(os.path.join(CORPUS, fname), outputs)
+    return outputs
+
+
+def test_query_filters(directory):
+    index = MetadataIndex(str(directory))
+    assert len(index) == 3
+    rows = index.query(lang='Spanish', min_version=0.7,
+                       analyzed_after='2022-12-31')
+    assert [row['ID'] for row in rows] == ['v07_multi_session_crlf']
+    rows = index.query(session='1111_Pre')
+    assert [row['ID'] for row in rows] == ['v07_single']
+
+
+def test_persistent_index_is_not_duplicated(directory, tmp_path):
+    db_path = str(tmp_path / 'index.db')
+    MetadataIndex(str(directory), db_path=db_path).close()
+    index = MetadataIndex(str(directory), db_path=db_path)
+    assert len(index) == 3
+    assert len(index.query(lang='English')) == 1
+
+
+def test_unrecognized_dates_are_null(directory, capsys):
+    path = directory / 'v07_single.csv'
+    text = path.read_text(encoding='utf-8')
+    path.write_text(text.replace('2021-06-14', '14 June 2021'),
+                    encoding='utf-8')
+    index = MetadataIndex(str(directory))
+    assert 'unrecognized analysis date' in capsys.readouterr().out
+    row, = index.query(session='1111_Pre')
+    assert row['analysis_date'] is None
+    assert index.query(analyzed_after='2000-01-01',
+                       session='1111_Pre') == []
+    assert index.query(analyzed_before='3000-01-01',
+                       session='1111_Pre') == []
+
+
+@pytest.mark.parametrize('date, expected', [
+    ('2021-06-14', '2021-06-14'),
+    ('2021/06/14', '2021-06-14'),
+    ('06/14/2021', '2021-06-14'),
+    ('14 June 2021', None)])
+def test_normalize_date(date, expected):
+    assert normalize_date(date) == expected
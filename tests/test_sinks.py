@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Round-trip tests for result sinks.
+"""
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from sinks import open_sink
+
+COLUMNS = ['ID', 'analysis', 'IPA']
+ROWS = [('S101', 'phonetic_inv', 'p'),
+        {'ID': 'S101', 'analysis': 'cluster_inv', 'IPA': 'tʰɹ'},
+        ('S102', 'targets', None)]
+EXPECTED = [('S101', 'phonetic_inv', 'p'),
+            ('S101', 'cluster_inv', 'tʰɹ'),
+            ('S102', 'targets', None)]
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        assert next(reader) == COLUMNS
+        return [tuple(v or None for v in row) for row in reader]
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [tuple(json.loads(line)[c] for c in COLUMNS) for line in f]
+
+
+def read_sqlite(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT * FROM results').fetchall()
+    finally:
+        conn.close()
+
+
+def read_parquet(path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    table = pq.read_table(path)
+    assert table.column_names == COLUMNS
+    return [tuple(row[c] for c in COLUMNS) for row in table.to_pylist()]
+
+
+@pytest.mark.parametrize('filename, reader', [
+    ('out.csv', read_csv),
+    ('out.jsonl', read_jsonl),
+    ('out.db', read_sqlite),
+    ('out.parquet', read_parquet)])
+@pytest.mark.parametrize('batch_size', [1, 2, 1000])
+def test_sink_round_trip(tmp_path, filename, reader, batch_size):
+    if filename.endswith('.parquet'):
+        pytest.importorskip('pyarrow')
+    output_dir = tmp_path / 'new_dir'
+    with open_sink(filename, COLUMNS, output_dir=str(output_dir),
+                   batch_size=batch_size) as sink:
+        sink.write_many(ROWS)
+    assert sink.rows_written == len(ROWS)
+    assert reader(output_dir / filename) == EXPECTED
+
+
+def test_sink_buffers_until_batch_size(tmp_path):
+    sink = open_sink('out.csv', COLUMNS, output_dir=str(tmp_path),
+                     batch_size=2)
+    sink.write(ROWS[0])
+    assert sink.rows_written == 0
+    sink.write(ROWS[1])
+    assert sink.rows_written == 2
+    sink.close()
+
+
+def test_csv_sink_writes_lists_as_pandas_does(tmp_path):
+    with open_sink('out.csv', ['', 'S101'], output_dir=str(tmp_path)) as sink:
+        sink.write(['phonetic_inv', ['p', 'b']])
+    assert (tmp_path / 'out.csv').read_text(encoding='utf-8') == (
+        ",S101\nphonetic_inv,\"['p', 'b']\"\n")
+
+
+def test_unknown_format_raises(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink('out.xlsx', COLUMNS, output_dir=str(tmp_path))